@@ -0,0 +1,130 @@
+# Copyright (c) 2025 Mike Chambers
+# https://github.com/mikechambers/echo
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is furnished to do
+# so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Reports peak resident memory used to process a screenshot at common
+# capture sizes, with and without a memory budget. This follows the path
+# lookup.py takes: the local engines load the screenshot for OCR, and with
+# --encode (OPENAI) it is first converted to a JPG which is base64 encoded.
+# Each measurement runs in its own process so peaks don't carry over between
+# sizes.
+#
+# Requires the resource module (Linux / macOS).
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import numpy as np
+import cv2
+import lookup
+from modules.image import read_image, encode_image_base64
+
+SIZES = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "ultrawide": (3440, 1440),
+    "4K": (3840, 2160),
+    "super ultrawide": (5120, 1440),
+    "8K": (7680, 4320),
+}
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    #linux reports KB, macOS reports bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _measure(path, budget_bytes, encode, queue):
+    lookup.memory_budget = budget_bytes
+    baseline = _peak_rss_mb()
+
+    if encode:
+        screenshot_path = lookup.convert_png_to_jpg(path)
+        encoded = encode_image_base64(screenshot_path)
+        del encoded
+    else:
+        screenshot_path = path
+
+    #the size the engines see
+    image = read_image(screenshot_path, grayscale=True, budget_bytes=budget_bytes)
+    shape = image.shape
+    del image
+
+    peak = _peak_rss_mb() - baseline
+
+    if screenshot_path != path:
+        os.remove(screenshot_path)
+
+    queue.put((shape, peak))
+
+
+def _write_screenshot(path, width, height):
+    #noise compresses badly, which gives a worst case file size
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    cv2.imwrite(path, image)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark peak memory used to load screenshots")
+    parser.add_argument("--memory-budget", type=int, default=4, help="Budget in MB to compare against (default: 4)")
+    parser.add_argument("--format", choices=["png", "jpg"], default="png", help="Screenshot format (default: png)")
+    parser.add_argument("--encode", action="store_true", help="Convert to JPG and base64 encode, as the OPENAI engine does")
+    args = parser.parse_args()
+
+    budget_bytes = args.memory_budget * 1024 * 1024
+    ctx = multiprocessing.get_context("spawn")
+
+    print(f"{'size':<16} {'decoded (full)':<16} {'peak MB (full)':>14} {'decoded (budget)':<18} {'peak MB (budget)':>16}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, (width, height) in SIZES.items():
+            path = os.path.join(temp_dir, f"screenshot_{width}x{height}.{args.format}")
+            #written in a child process as well, since linux children
+            #inherit the parent's peak rss
+            p = ctx.Process(target=_write_screenshot, args=(path, width, height))
+            p.start()
+            p.join()
+
+            results = []
+            for budget in (None, budget_bytes):
+                queue = ctx.Queue()
+                p = ctx.Process(target=_measure, args=(path, budget, args.encode, queue))
+                p.start()
+                results.append(queue.get())
+                p.join()
+
+            (full_shape, full_peak), (budget_shape, budget_peak) = results
+            full_dims = f"{full_shape[1]}x{full_shape[0]}"
+            budget_dims = f"{budget_shape[1]}x{budget_shape[0]}"
+
+            print(f"{name:<16} {full_dims:<16} {full_peak:>14.1f} {budget_dims:<18} {budget_peak:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
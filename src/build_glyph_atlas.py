@@ -0,0 +1,78 @@
+# Copyright (c) 2025 Mike Chambers
+# https://github.com/mikechambers/echo
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is furnished to do
+# so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Builds the glyph atlas used by the TEMPLATE engine from labelled captures.
+#
+# The labels file is a CSV with one capture per row: path,bungie_id
+# Paths are relative to the labels file. Captures cropped to the name line
+# work best.
+
+import argparse
+import csv
+import os
+import sys
+import cv2
+from modules.glyph import build_atlas
+
+DEFAULT_ATLAS_DIR = os.path.join(os.path.expanduser("~"), ".lookup", "glyph_atlas")
+
+
+def _load_samples(labels_path: str):
+    base_dir = os.path.dirname(os.path.abspath(labels_path))
+
+    with open(labels_path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+
+            path = os.path.join(base_dir, row[0].strip())
+            gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+
+            if gray is None:
+                print(f"Warning: Could not load image from path {path}. Ignoring")
+                continue
+
+            yield gray, row[1].strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the glyph atlas for the TEMPLATE engine from labelled captures")
+    parser.add_argument("labels", type=str, help="CSV file of path,bungie_id rows")
+    parser.add_argument("--output", type=str, default=DEFAULT_ATLAS_DIR, help=f"Directory to save the atlas to (default: {DEFAULT_ATLAS_DIR})")
+    parser.add_argument("--verbose", action="store_true", help="display additional information as script runs")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.labels):
+        print(f"Error: {args.labels} is not a valid file.")
+        sys.exit(1)
+
+    used = build_atlas(_load_samples(args.labels), args.output, args.verbose)
+
+    if not used:
+        print(f"Error: No usable captures found in {args.labels}. Try captures cropped to the name line.")
+        sys.exit(1)
+
+    print(f"Built glyph atlas in '{args.output}' from {used} capture(s)")
+
+
+if __name__ == "__main__":
+    main()
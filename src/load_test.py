@@ -0,0 +1,348 @@
+# Copyright (c) 2025 Mike Chambers
+# https://github.com/mikechambers/echo
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is furnished to do
+# so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Measures how the watch -> OCR -> Destiny API -> launch pipeline behaves when
+# screenshots arrive faster than they can be processed.
+#
+# Screenshots from a fixture corpus are written into a temporary watched
+# directory at a configurable rate and burst size. The Destiny and Open AI
+# APIs are replaced with local servers with injectable latency and errors,
+# and launching the browser / playing sounds is stubbed out.
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PIL import Image, ImageDraw
+from watchdog.observers import Observer
+import lookup
+from modules import destiny
+from modules.watcher import build_path_filter, MtimeIndex, ScreenshotQueue, ScreenshotEventHandler
+
+
+class StubServer:
+    """Local HTTP server standing in for the Destiny and Open AI APIs."""
+
+    def __init__(self, latency_ms: float, error_rate: float):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self, None)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                server._handle(self, json.loads(self.rfile.read(length) or b"{}"))
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
+
+    def _handle(self, handler, body):
+        with self._lock:
+            self.requests += 1
+            fail = random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+
+        if self.latency_ms:
+            #jitter latency +/- 50%
+            time.sleep(self.latency_ms * random.uniform(0.5, 1.5) / 1000)
+
+        if fail:
+            status, data = 500, {"ErrorCode": 0, "Message": "Injected error"}
+        elif handler.path.startswith("/openai/"):
+            status, data = 200, self._openai_response(body)
+        else:
+            status, data = 200, self._destiny_response(handler.path, body)
+
+        out = json.dumps(data).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(out)))
+        handler.end_headers()
+        handler.wfile.write(out)
+
+    @staticmethod
+    def _membership_id(name: str) -> str:
+        return str(int(hashlib.sha1(name.encode("utf-8")).hexdigest()[:12], 16))
+
+    def _destiny_response(self, path, body):
+        if "SearchDestinyPlayerByBungieName" in path:
+            name = f"{body['displayName']}#{body['displayNameCode']}"
+            return {"ErrorCode": 1, "Response": [{
+                "membershipId": self._membership_id(name),
+                "membershipType": 3,
+                "crossSaveOverride": 0,
+            }]}
+
+        if "LinkedProfiles" in path:
+            return {"ErrorCode": 1, "Response": {"profiles": []}}
+
+        return {"ErrorCode": 1, "Response": {"profileTransitoryData": {}}}
+
+    def _openai_response(self, body):
+        #name the player after the image, so the same fixture always gives the same id
+        image_url = body["messages"][1]["content"][1]["image_url"]["url"]
+        digest = hashlib.sha1(image_url.encode("utf-8")).hexdigest()
+        id_str = f"Load{digest[:6]}#{int(digest[6:10], 16) % 10000:04d}"
+
+        return {
+            "id": "chatcmpl-load-test",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", ""),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": json.dumps({"id_str": id_str, "confidence": 1.0}),
+                    "refusal": None,
+                },
+            }],
+        }
+
+
+class Recorder:
+    """Records when each screenshot was written, queued and launched."""
+
+    def __init__(self):
+        self.written = {}
+        self.queued = set()
+        self.finished = {}
+        self.launched = {}
+        self.queue_depths = []
+        self.last_queued = time.monotonic()
+        self.current_path = None
+        self._lock = threading.Lock()
+
+    def write(self, path):
+        with self._lock:
+            self.written[os.path.normcase(os.path.abspath(path))] = time.monotonic()
+
+    def queue(self, path):
+        with self._lock:
+            self.queued.add(os.path.normcase(os.path.abspath(path)))
+            self.last_queued = time.monotonic()
+
+    def finish(self, path):
+        with self._lock:
+            self.finished[os.path.normcase(os.path.abspath(path))] = time.monotonic()
+
+    def launch(self):
+        with self._lock:
+            self.launched[os.path.normcase(os.path.abspath(self.current_path))] = time.monotonic()
+
+
+def _create_corpus(corpus_dir: str, count: int = 5):
+    """Creates simple synthetic screenshots to use when no corpus is given."""
+    for i in range(count):
+        img = Image.new("RGB", (1920, 1080), (20, 20, 30))
+        draw = ImageDraw.Draw(img)
+        draw.text((400, 500), f"® LoadTest{i}#{1000 + i}", fill=(255, 255, 255))
+        img.save(os.path.join(corpus_dir, f"fixture_{i}.png"))
+
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def run(args):
+    temp_dir = tempfile.mkdtemp(prefix="lookup_load_")
+    watch_dir = os.path.join(temp_dir, "screenshots")
+    os.makedirs(watch_dir)
+
+    corpus_dir = args.corpus
+    if not corpus_dir:
+        corpus_dir = os.path.join(temp_dir, "corpus")
+        os.makedirs(corpus_dir)
+        _create_corpus(corpus_dir)
+
+    path_filter = build_path_filter(lookup.allowed_extensions)
+    corpus = sorted(os.path.join(corpus_dir, f) for f in os.listdir(corpus_dir) if path_filter(f))
+    if not corpus:
+        print(f"Error: No screenshots found in {corpus_dir}")
+        sys.exit(1)
+
+    server = StubServer(args.api_latency, args.error_rate)
+    recorder = Recorder()
+
+    #point the pipeline at the stub server, and stub out launching
+    destiny.API_ROOT = f"{server.url}/Platform"
+    os.environ["OPENAI_BASE_URL"] = f"{server.url}/openai"
+    os.environ.setdefault("OPENAI_API_KEY", "load-test")
+
+    lookup.api_key = "load-test"
+    lookup.engine = lookup.Engine[args.engine]
+    lookup.verbose = args.verbose
+    lookup.play_sound_on_launch = False
+    lookup.webbrowser.open = lambda url: recorder.launch()
+
+    process_screenshot = lookup.process_screenshot
+
+    def _process_screenshot(path):
+        recorder.current_path = path
+        try:
+            process_screenshot(path)
+        finally:
+            recorder.finish(path)
+
+    lookup.process_screenshot = _process_screenshot
+
+    #same wiring as lookup.main()
+    screenshot_queue = ScreenshotQueue()
+    put = screenshot_queue.put
+
+    def _put(root, path):
+        accepted = put(root, path)
+        if accepted:
+            recorder.queue(path)
+        return accepted
+
+    screenshot_queue.put = _put
+
+    mtime_index = MtimeIndex(os.path.join(temp_dir, "mtime_index.json"))
+    threading.Thread(target=lookup._process_queue, args=(screenshot_queue, mtime_index), daemon=True).start()
+
+    observer = Observer()
+    observer.schedule(ScreenshotEventHandler(watch_dir, path_filter, screenshot_queue), watch_dir, recursive=False)
+    observer.start()
+
+    stop_sampling = threading.Event()
+
+    def _sample_queue():
+        while not stop_sampling.wait(0.1):
+            recorder.queue_depths.append(screenshot_queue.qsize())
+
+    threading.Thread(target=_sample_queue, daemon=True).start()
+
+    print(f"Writing {args.count} screenshots at {args.rate}/sec in bursts of {args.burst} (engine: {args.engine}, api latency: {args.api_latency}ms, error rate: {args.error_rate}) ...")
+
+    start = time.monotonic()
+    interval = args.burst / args.rate
+    for i in range(args.count):
+        if i and i % args.burst == 0:
+            time.sleep(max(0.0, start + (i // args.burst) * interval - time.monotonic()))
+
+        source = corpus[i % len(corpus)]
+        path = os.path.join(watch_dir, f"screenshot_{i:06d}{os.path.splitext(source)[1]}")
+
+        #write to a temp name and rename, so the file is complete when the event fires
+        tmp_path = os.path.join(temp_dir, os.path.basename(path))
+        shutil.copyfile(source, tmp_path)
+        recorder.write(path)
+        os.replace(tmp_path, path)
+
+    write_time = time.monotonic() - start
+
+    #wait for everything that was queued to be processed. Events that
+    #haven't arrived a couple of seconds after the queue empties are dropped
+    deadline = time.monotonic() + args.drain_timeout
+    while time.monotonic() < deadline:
+        if len(recorder.finished) >= len(recorder.written):
+            break
+
+        if len(recorder.finished) >= len(recorder.queued) and time.monotonic() - recorder.last_queued > 2:
+            break
+
+        time.sleep(0.1)
+
+    total_time = time.monotonic() - start
+
+    stop_sampling.set()
+    observer.stop()
+    observer.join()
+    server.close()
+
+    latencies = [(recorder.launched[p] - recorder.written[p]) * 1000 for p in recorder.launched if p in recorder.written]
+    dropped = len(recorder.written) - len(recorder.queued)
+    unfinished = len(recorder.queued) - len(recorder.finished)
+    failed = len(recorder.finished) - len(recorder.launched)
+
+    print()
+    print(f"Written           : {len(recorder.written)} in {write_time:.1f}s ({len(recorder.written) / write_time:.1f}/sec)")
+    print(f"Processed         : {len(recorder.finished)} in {total_time:.1f}s ({len(recorder.finished) / total_time:.2f} screenshots/sec)")
+    print(f"Launched          : {len(recorder.launched)}")
+    print(f"Failed            : {failed}")
+    print(f"Dropped events    : {dropped}")
+    print(f"Not processed     : {unfinished} (still queued after {args.drain_timeout}s)")
+    print(f"API requests      : {server.requests} ({server.errors} injected errors)")
+
+    if recorder.queue_depths:
+        print(f"Queue depth       : max {max(recorder.queue_depths)}, mean {statistics.mean(recorder.queue_depths):.1f}")
+
+    if latencies:
+        print(f"Latency (ms)      : p50 {_percentile(latencies, 50):.0f}, p90 {_percentile(latencies, 90):.0f}, "
+              f"p99 {_percentile(latencies, 99):.0f}, max {max(latencies):.0f}")
+
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the screenshot watcher pipeline against local stand-in APIs")
+    parser.add_argument("--corpus", type=str, help="Directory of screenshots to write (default: generated screenshots)")
+    parser.add_argument("--count", type=int, default=50, help="Number of screenshots to write (default: 50)")
+    parser.add_argument("--rate", type=float, default=2.0, help="Screenshots written per second (default: 2)")
+    parser.add_argument("--burst", type=int, default=1, help="Number of screenshots written at once (default: 1)")
+    parser.add_argument("--engine", type=str.upper, choices=[e.name for e in lookup.Engine], default=lookup.Engine.OPENAI.name,
+                        help="Engine to use. OPENAI uses the stand-in server, so doesn't need Tesseract (default: OPENAI)")
+    parser.add_argument("--api-latency", type=float, default=100.0, help="Mean stand-in API latency in ms (default: 100)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stand-in API requests that fail (default: 0)")
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="Seconds to wait for queued screenshots after writing (default: 60)")
+    parser.add_argument("--verbose", action="store_true", help="display additional information as script runs")
+    args = parser.parse_args()
+
+    if args.rate <= 0 or args.burst < 1:
+        parser.error("--rate must be greater than 0 and --burst at least 1")
+
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,22 +24,30 @@ import argparse
 import sys
 import time
 import os
-import base64
 from pydantic import BaseModel
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 from openai import OpenAI
 from modules.destiny import Destiny
 from modules.member import BungieId, Member
+from modules.image import read_image, encode_image_base64
+from modules.glyph import GlyphMatcher
+from modules.player_index import PlayerIndex
+from modules.stats import ActivitySummary, format_summary
+from modules.mode import Mode
+from modules.frames import FrameSource, ChangeDetector, crop_roi, find_name_regions
+from modules.watcher import build_path_filter, MtimeIndex, ScreenshotQueue, ScreenshotEventHandler, scan_backlog, wait_for_write
+from modules.bulk import read_bungie_ids, resolve_bungie_ids, ResultWriter, DEFAULT_WORKERS
 import webbrowser
 from playsound import playsound
 import traceback
 import tempfile
-from PIL import Image
-from enum import Enum
 import cv2
+from enum import Enum
 import pytesseract
 import re
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
 
 ##todo
 # dont convert to jpg if file is jpg
@@ -49,37 +57,102 @@ VERSION = "0.85.1"
 API_KEY_ENV_NAME = "DESTINY_API_KEY"
 OPENAI_API_KEY_ENV_NAME = "OPENAI_API_KEY"
 LAUNCH_WAV = "launched.wav"
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".lookup")
+MTIME_INDEX_FILE = os.path.join(DATA_DIR, "mtime_index.json")
+GLYPH_ATLAS_DIR = os.path.join(DATA_DIR, "glyph_atlas")
+PLAYER_INDEX_FILE = os.path.join(DATA_DIR, "players.jsonl")
 
 verbose = False
 play_sound_on_launch = True
 
-screenshot_dir = None
+screenshot_dirs = []
 allowed_extensions = ["png", "jpg"]
+file_patterns = None
+recursive = False
 
 optimize_screenshot = True
 fallback = False
 api_key = None
 
+#max bytes for a decoded screenshot. If set, large captures are decoded at
+#reduced scale. None means always decode at full size
+memory_budget = None
+
 
 class Engine(Enum):
     OPENCV = 1
     OPENAI = 2
+    TEMPLATE = 3
 
 engine = Engine.OPENCV
 
+#loaded at startup when using the TEMPLATE engine
+glyph_matcher = None
+
+#local index of previously resolved players, checked before calling the API
+player_index = None
+
+#max edits between a parsed name and an indexed name with the same code for
+#them to be considered a match. 0 only allows exact matches
+match_distance = 1
+
+#after a member is found, look up the other players in their fireteam in the
+#background, so they are already in the player index
+prefetch_fireteam = False
+open_fireteam = False
+prefetch_limit = 2
+prefetch_executor = None
+_prefetched_ids = set()
+_prefetched_lock = threading.Lock()
+
+#print a summary of the member's recent stats while the report loads
+show_summary = False
+summary_executor = None
+SUMMARY_GAME_COUNT = 25
+SUMMARY_CACHE_SECONDS = 60
+
+#only what the summary needs: profile (name), characters and activities
+SUMMARY_COMPONENTS = "100,200,204"
+_summary_cache = {}
+
 
 class ImageAnalysis(BaseModel):
     id_str: str
     confidence: float
 
 def main():
-    event_handler = FileSystemEventHandler()
-    event_handler.on_created = on_created
+    path_filter = build_path_filter(allowed_extensions, file_patterns)
+    screenshot_queue = ScreenshotQueue()
+    mtime_index = MtimeIndex(MTIME_INDEX_FILE)
+
+    worker = threading.Thread(target=_process_queue, args=(screenshot_queue, mtime_index), daemon=True)
+    worker.start()
+
     observer = Observer()
-    observer.schedule(event_handler, screenshot_dir, recursive=False)
+    for root in screenshot_dirs:
+        event_handler = ScreenshotEventHandler(root, path_filter, screenshot_queue, verbose)
+        observer.schedule(event_handler, root, recursive=recursive)
     observer.start()
 
-    print(f"Watching folder '{screenshot_dir}' for {allowed_extensions} ...")
+    # scan after the observer starts so nothing written in between is missed.
+    # The queue ignores files that are picked up by both.
+    for root in screenshot_dirs:
+        since = mtime_index.get(root)
+
+        if since is None:
+            # first time watching this folder, so don't process old screenshots
+            mtime_index.update(root, time.time())
+            continue
+
+        backlog = scan_backlog(root, since, recursive, path_filter)
+        if backlog:
+            print(f"Found {len(backlog)} screenshot(s) in '{root}' saved while not running")
+
+        for _, path in backlog:
+            screenshot_queue.put(root, path)
+
+    for root in screenshot_dirs:
+        print(f"Watching folder '{root}'{' (recursive)' if recursive else ''} for {allowed_extensions} ...")
 
     try:
         while True:
@@ -88,16 +161,119 @@ def main():
         observer.stop()
     observer.join()
 
+def _process_queue(screenshot_queue:ScreenshotQueue, mtime_index:MtimeIndex):
+    while True:
+        root, path = screenshot_queue.get()
+
+        try:
+            wait_for_write(path)
+            mtime = os.path.getmtime(path)
+
+            process_screenshot(path)
+            mtime_index.update(root, mtime)
+        except Exception as e:
+            print(f"Error processing screenshot {path} : {e}")
+
+            if verbose:
+                traceback.print_exc()
+        finally:
+            screenshot_queue.task_done(path)
+
+def bulk_lookup(ids_file:str, output_path:str, workers:int):
+    bungie_ids, invalid = read_bungie_ids(ids_file)
+
+    for value in invalid:
+        print(f"Could not parse Bungie Id : {value}. Ignoring", file=sys.stderr)
+
+    total = len(bungie_ids)
+    print(f"Resolving {total} Bungie Ids from '{ids_file}' using {workers} workers ...", file=sys.stderr)
+
+    out = sys.stdout
+    if output_path:
+        out = open(output_path, "w", newline="", encoding="utf-8")
+
+    writer = ResultWriter(out, bool(output_path) and ResultWriter.is_jsonl_path(output_path))
+
+    found = 0
+    completed = 0
+    start = time.monotonic()
+    try:
+        to_resolve = []
+        for bungie_id in bungie_ids:
+            member = player_index.get(bungie_id) if player_index else None
+
+            if member:
+                writer.write(bungie_id, member, None)
+                completed += 1
+                found += 1
+            else:
+                to_resolve.append(bungie_id)
+
+        if completed:
+            print(f"{completed}/{total} found in local player index", file=sys.stderr)
+
+        for bungie_id, member, error in resolve_bungie_ids(to_resolve, api_key, workers, verbose=verbose):
+            writer.write(bungie_id, member, error)
+
+            if member and player_index:
+                player_index.add(bungie_id, member)
+
+            completed += 1
+            if member:
+                found += 1
+
+            if error and verbose:
+                print(f"Error retrieving {bungie_id} : {error}", file=sys.stderr)
+
+            if completed % 50 == 0 or completed == total:
+                elapsed = time.monotonic() - start
+                rate = completed / elapsed if elapsed else 0.0
+                print(f"{completed}/{total} resolved ({found} found) : {rate:.1f} ids/sec", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
 def encode_image(image_path:str):
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
+    return encode_image_base64(image_path)
 
 def retrieve_member(bungie_id:BungieId) -> Member:
+    if player_index:
+        member = player_index.get(bungie_id)
+
+        if member:
+            if verbose:
+                print(f"Found {bungie_id} in local player index")
+            return member
+
     destiny = Destiny(api_key, verbose)
 
-    member = destiny.retrieve_member(bungie_id)
+    try:
+        member = destiny.retrieve_member(bungie_id)
+    except Exception:
+        member = _find_closest_in_index(bungie_id)
+        if member:
+            return member
+        raise
 
-    return member
+    if member:
+        if player_index:
+            player_index.add(bungie_id, member)
+        return member
+
+    # names are only unique together with the code, so a close match is only
+    # used once the API says the parsed id doesn't exist (i.e. it was misread)
+    return _find_closest_in_index(bungie_id)
+
+def _find_closest_in_index(bungie_id:BungieId) -> Member:
+    if not player_index:
+        return None
+
+    match = player_index.find_closest(bungie_id, match_distance)
+    if not match:
+        return None
+
+    print(f"Could not find {bungie_id}. Using closest previously found player {match[0]}")
+    return match[1]
 
 
 def play_sound(file_path: str):
@@ -106,13 +282,100 @@ def play_sound(file_path: str):
     except Exception as e:
         print(f"Warning: Failed to play sound {file_path}. Error: {e}. Ignoring")
 
+def _trials_report_url(member:Member) -> str:
+    return f"https://destinytrialsreport.com/report/{member.platform_id}/{member.membership_id}"
+
 def launch_trials_report(member:Member):
 
+    # start before the sound / browser so the requests run while they launch
+    if show_summary:
+        summary_executor.submit(_print_summary, member)
+
     if play_sound_on_launch:
         play_sound(LAUNCH_WAV)
 
-    url = f"https://destinytrialsreport.com/report/{member.platform_id}/{member.membership_id}"
-    webbrowser.open(url)
+    webbrowser.open(_trials_report_url(member))
+
+    if prefetch_fireteam:
+        with _prefetched_lock:
+            _prefetched_ids.add(member.membership_id)
+        prefetch_executor.submit(_prefetch_fireteam, member)
+
+
+def _retrieve_activity_summary(destiny:Destiny, member:Member, character_id:str, mode:Mode) -> ActivitySummary:
+    activities = destiny.retrieve_activity_history(member, character_id, mode, SUMMARY_GAME_COUNT)
+    return ActivitySummary.from_activities(activities)
+
+def _print_summary(member:Member):
+    try:
+        cached = _summary_cache.get(member.membership_id)
+        if cached and time.monotonic() - cached[0] < SUMMARY_CACHE_SECONDS:
+            print(cached[1])
+            return
+
+        start = time.monotonic()
+        destiny = Destiny(api_key, verbose)
+        profile = destiny.retrieve_profile(member, SUMMARY_COMPONENTS)
+
+        character = destiny.find_most_recent_character(profile)
+        if not character:
+            print(f"No characters found for {member}")
+            return
+
+        # the two histories don't depend on each other, so fetch them together
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pvp = executor.submit(_retrieve_activity_summary, destiny, member, character["id"], Mode.ALL_PVP)
+            trials = executor.submit(_retrieve_activity_summary, destiny, member, character["id"], Mode.TRIALS_OF_OSIRIS)
+
+            modes = destiny.retrieve_current_activity_modes(member, profile)
+
+            user_info = profile["Response"].get("profile", {}).get("data", {}).get("userInfo", {})
+            bungie_id = BungieId(user_info.get("bungieGlobalDisplayName", ""), BungieId.parse_code(user_info.get("bungieGlobalDisplayNameCode")))
+            name = str(bungie_id) if bungie_id.is_valid else str(member)
+
+            summary = format_summary(name, modes, pvp.result(), trials.result())
+
+        _summary_cache[member.membership_id] = (time.monotonic(), summary)
+        print(summary)
+
+        if verbose:
+            print(f"Summary retrieved in {(time.monotonic() - start) * 1000:.0f}ms")
+    except Exception as e:
+        print(f"Warning: Failed to retrieve stats summary for {member}. Error: {e}. Ignoring")
+
+        if verbose:
+            traceback.print_exc()
+
+def _prefetch_fireteam(member:Member):
+    try:
+        destiny = Destiny(api_key, verbose)
+        party_ids = destiny.retrieve_party_member_ids(member)
+
+        # skip anyone already looked up this session, and cap the work done per lookup
+        with _prefetched_lock:
+            party_ids = [i for i in party_ids if i not in _prefetched_ids][:prefetch_limit]
+            _prefetched_ids.update(party_ids)
+
+        for membership_id in party_ids:
+            result = destiny.retrieve_member_by_id(membership_id)
+            if not result:
+                continue
+
+            bungie_id, party_member = result
+
+            if verbose:
+                print(f"Prefetched fireteam member {bungie_id}")
+
+            if player_index and bungie_id.is_valid:
+                player_index.add(bungie_id, party_member)
+
+            if open_fireteam:
+                webbrowser.open(_trials_report_url(party_member))
+    except Exception as e:
+        print(f"Warning: Failed to prefetch fireteam for {member}. Error: {e}. Ignoring")
+
+        if verbose:
+            traceback.print_exc()
 
 
 def _parse_bungie_id(value: str) -> BungieId:
@@ -125,7 +388,26 @@ def parse_bungie_id_from_screenshot(path:str, engine:Engine) -> str:
         return _open_ai_parse(path)
     elif engine == Engine.OPENCV:
         return _open_cv_parse(path)
-    
+    elif engine == Engine.TEMPLATE:
+        return _template_parse(path)
+
+
+def _template_parse(path: str) -> str:
+    """
+    Loads an image at `path` and returns the Bungie ID found by matching
+    glyphs against the template atlas.
+
+    Returns:
+        str: The best matching Bungie ID found, or an empty string if none.
+    """
+
+    gray = read_image(path, grayscale=True, budget_bytes=memory_budget)
+    if gray is None:
+        print(f"Error: Could not load image from path {path}")
+        return ""
+
+    return glyph_matcher.find_bungie_id(gray)
+
 
 def _open_cv_parse(path: str) -> str:
     """
@@ -136,15 +418,13 @@ def _open_cv_parse(path: str) -> str:
         str: The first matching Bungie ID found, or an empty string if none.
     """
 
-    # Load the image
-    image = cv2.imread(path)
-    if image is None:
+    # Load the image directly as grayscale (often improves OCR accuracy), so
+    # we never hold a full color copy
+    gray = read_image(path, grayscale=True, budget_bytes=memory_budget)
+    if gray is None:
         print(f"Error: Could not load image from path {path}")
         return ""
 
-    # Convert the image to grayscale (often improves OCR accuracy)
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
     # Perform OCR using pytesseract
     text = pytesseract.image_to_string(gray)
 
@@ -242,18 +522,23 @@ def convert_png_to_jpg(png_path: str) -> str:
     if not os.path.isfile(png_path):
         raise FileNotFoundError(f"File not found: {png_path}")
 
-    # Open the PNG image
-    with Image.open(png_path) as img:
-        # Convert image to RGB (to remove transparency, if any)
-        img = img.convert("RGB")
+    # Decode with cv2 so the memory budget bounds decoding too. PIL has to
+    # load the whole PNG before it can be reduced.
+    image = read_image(png_path, budget_bytes=memory_budget)
+    if image is None:
+        raise ValueError(f"Could not load image: {png_path}")
+
+    if verbose and memory_budget:
+        height, width = image.shape[:2]
+        print(f"Loaded screenshot at {width}x{height} to fit memory budget")
 
-        # Create a temporary file for the JPG
-        temp_dir = tempfile.gettempdir()  # Get system temp directory
-        jpg_filename = os.path.splitext(os.path.basename(png_path))[0] + ".jpg"
-        jpg_path = os.path.join(temp_dir, jpg_filename)
+    # Create a temporary file for the JPG
+    temp_dir = tempfile.gettempdir()  # Get system temp directory
+    jpg_filename = os.path.splitext(os.path.basename(png_path))[0] + ".jpg"
+    jpg_path = os.path.join(temp_dir, jpg_filename)
 
-        # Save as JPG
-        img.save(jpg_path, "JPEG", quality=75)
+    # Save as JPG
+    cv2.imwrite(jpg_path, image, [cv2.IMWRITE_JPEG_QUALITY, 75])
 
     return jpg_path  # Return the path to the new JPG
 
@@ -294,52 +579,135 @@ def parse_and_retrieve_member(path:str, engine:Engine) -> Member:
     return member
 
 
-def on_created(event):
-    if not event.is_directory:
-        # Check if file matches one of our allowed extensions
-        lower_path = event.src_path.lower()
-        if not any(lower_path.endswith(ext) for ext in allowed_extensions):
-            return
-        
+def process_screenshot(path:str):
+    member = find_member_in_screenshot(path)
+
+    if not member:
+        return
+
+    launch_trials_report(member)
+
+def find_member_in_screenshot(path:str) -> Member:
+    #only OPENAI uses the jpg. The local engines read the original
+    #screenshot, which uses less memory with a budget since PNGs can't be
+    #decoded at reduced scale without first being fully decompressed.
+    jpg_path = None
+    if optimize_screenshot and engine == Engine.OPENAI:
+        jpg_path = _convert_screenshot(path)
+
+    member = parse_and_retrieve_member(jpg_path or path, engine)
+
+    if not member and fallback:
+
+
+        e = None
+        if engine == Engine.OPENAI:
+            e = Engine.OPENCV
+        else:
+            e = Engine.OPENAI
+
         if verbose:
-            print(f"New image detected: {event.src_path}")
+            print(f"Primary engine ({engine}) failed. Falling back to secondary engine ({e}).")
 
-        time.sleep(1.0)
+        if optimize_screenshot and e == Engine.OPENAI:
+            jpg_path = _convert_screenshot(path)
 
-        screenshot_path = event.src_path
+        member = parse_and_retrieve_member(jpg_path or path, e)
 
-        if optimize_screenshot:
-            screenshot_path = convert_png_to_jpg(event.src_path)
-            if verbose:
-                print(f"Using jpg : {screenshot_path}")
+    if jpg_path and os.path.exists(jpg_path):
+        os.remove(jpg_path)
+        if verbose:
+            print(f"Temporary file deleted: {jpg_path}")
 
-        member = parse_and_retrieve_member(screenshot_path, engine)
+    return member
 
-        if not member and fallback:
+def _convert_screenshot(path:str) -> str:
+    jpg_path = convert_png_to_jpg(path)
+    if verbose:
+        print(f"Using jpg : {jpg_path}")
+    return jpg_path
 
+def watch_video(source, sample_fps:float, roi):
+    frame_source = FrameSource(source, sample_fps)
 
-            e = None
-            if engine == Engine.OPENAI:
-                e = Engine.OPENCV
-            else:
-                e = Engine.OPENAI
+    # for live sources only the newest candidate frame is kept while OCR is
+    # busy. Files are read faster than real time, so reading waits for OCR
+    # instead of dropping cards
+    frame_queue = queue.Queue(maxsize=1)
 
-            if verbose:
-                print(f"Primary engine ({engine}) failed. Falling back to secondary engine ({e}).")
+    worker = threading.Thread(target=_process_frames, args=(frame_queue,), daemon=True)
+    worker.start()
 
-            member = parse_and_retrieve_member(screenshot_path, e)
+    print(f"Watching video source '{source}' (sampling {sample_fps} fps) ...")
+
+    detector = ChangeDetector()
+    try:
+        for frame in frame_source.frames():
+            region = crop_roi(frame, roi)
+
+            if not detector.update(region) or not find_name_regions(region):
+                continue
 
-        if optimize_screenshot and os.path.exists(screenshot_path):
-            os.remove(screenshot_path)
             if verbose:
-                print(f"Temporary file deleted: {screenshot_path}")
+                print("New player card detected in video")
+
+            if not frame_source.is_live:
+                frame_queue.put(frame)
+                continue
+
+            try:
+                frame_queue.put_nowait(frame)
+            except queue.Full:
+                try:
+                    frame_queue.get_nowait()
+                    frame_queue.task_done()
+                except queue.Empty:
+                    pass
+                frame_queue.put_nowait(frame)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        frame_source.close()
 
+    frame_queue.join()
 
-        if not member:
-            return
+def _process_frames(frame_queue:queue.Queue):
+    launched_ids = set()
+
+    while True:
+        frame = frame_queue.get()
+
+        fd, path = tempfile.mkstemp(suffix=".png")
+        os.close(fd)
+
+        try:
+            cv2.imwrite(path, frame)
+            member = find_member_in_screenshot(path)
+
+            # the same card can show up many times in a video
+            if member and member.membership_id not in launched_ids:
+                launched_ids.add(member.membership_id)
+                launch_trials_report(member)
+        except Exception as e:
+            print(f"Error processing video frame : {e}")
+
+            if verbose:
+                traceback.print_exc()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+            frame_queue.task_done()
+
+def _parse_roi(value:str):
+    try:
+        roi = tuple(float(v) for v in value.split(","))
+    except ValueError:
+        roi = ()
 
+    if len(roi) != 4 or not all(0.0 <= v <= 1.0 for v in roi):
+        raise argparse.ArgumentTypeError("must be x,y,w,h as fractions of the frame size (e.g. 0.25,0,0.5,0.5)")
 
-        launch_trials_report(member)
+    return roi
             
 def _get_arg_from_env_or_error(env_var):
     if env_var in os.environ:
@@ -369,8 +737,59 @@ if __name__ == "__main__":
     parser.add_argument(
         "--screenshot-dir",
         type=str,
-        required=True,
-        help="Path to the directory where screenshots are stored"
+        action="append",
+        help="Path to the directory where screenshots are stored. Can be specified multiple times"
+    )
+
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Also watch subdirectories of each screenshot directory"
+    )
+
+    parser.add_argument(
+        "--pattern",
+        type=str,
+        action="append",
+        help="Only process screenshots whose file name matches this glob (e.g. 'Destiny2*'). Can be specified multiple times"
+    )
+
+    parser.add_argument(
+        "--ids-file",
+        type=str,
+        help="Resolve Bungie Ids listed in a text or CSV file instead of watching for screenshots"
+    )
+
+    parser.add_argument(
+        "--video",
+        type=str,
+        help="Look for player cards in a video file or capture device (use the device number, e.g. 0) instead of watching for screenshots"
+    )
+
+    parser.add_argument(
+        "--sample-fps",
+        type=float,
+        default=10.0,
+        help="Number of video frames a second to check for new player cards (default: 10)"
+    )
+
+    parser.add_argument(
+        "--roi",
+        type=_parse_roi,
+        help="Only check this part of each video frame for changes, as x,y,w,h fractions of the frame (e.g. 0.25,0,0.5,0.5)"
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="File to write --ids-file results to. Uses JSONL if it ends in .jsonl, otherwise CSV (default: stdout as CSV)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of concurrent lookups when using --ids-file (default: {DEFAULT_WORKERS})"
     )
 
     parser.add_argument(
@@ -387,34 +806,147 @@ if __name__ == "__main__":
     )
     """
 
-    valid_choices = [e.name for e in Engine]  # e.g. ["OPENCV", "OPENAI"]
+    valid_choices = [e.name for e in Engine]  # e.g. ["OPENCV", "OPENAI", "TEMPLATE"]
     parser.add_argument(
         "--engine",
         type=str.upper,             # Convert user input to uppercase
         choices=valid_choices,      # Must match these after .upper()
         default=Engine.OPENCV.name, # Default is "OPENCV"
-        help="Specify which engine to use (case-insensitive). Choices: OPENCV, OPENAI."
+        help="Specify which engine to use (case-insensitive). Choices: OPENCV, OPENAI, TEMPLATE."
+    )
+
+    parser.add_argument(
+        "--glyph-atlas",
+        type=str,
+        default=GLYPH_ATLAS_DIR,
+        help=f"Directory containing the glyph atlas used by the TEMPLATE engine (default: {GLYPH_ATLAS_DIR})"
+    )
+
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        help="Max memory in MB for each decoded screenshot. Large (4K / 8K / ultrawide) captures are decoded at reduced scale to fit (default: no limit)"
+    )
+
+    parser.add_argument(
+        "--match-distance",
+        type=int,
+        default=match_distance,
+        help=f"Max number of characters that can differ when matching a name the API can't find against previously found players. 0 to disable (default: {match_distance})"
+    )
+
+    parser.add_argument(
+        "--no-player-index",
+        action="store_true",
+        help="Don't check or save previously found players locally"
+    )
+
+    parser.add_argument(
+        "--prefetch-fireteam",
+        action="store_true",
+        help="After a player is found, look up the rest of their fireteam in the background so later screenshots of them don't need an API lookup"
+    )
+
+    parser.add_argument(
+        "--open-fireteam",
+        action="store_true",
+        help="Also open the report for each fireteam member found (implies --prefetch-fireteam)"
+    )
+
+    parser.add_argument(
+        "--prefetch-limit",
+        type=int,
+        default=prefetch_limit,
+        help=f"Max number of fireteam members to look up for each player found (default: {prefetch_limit})"
+    )
+
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Print a summary of the player's current activity and recent PvP stats while the report loads"
     )
 
     args = parser.parse_args()
 
+    if not args.screenshot_dir and not args.ids_file and not args.video:
+        parser.error("one of --screenshot-dir, --ids-file or --video is required")
+
     fallback = args.fallback
     engine = Engine[args.engine]
 
     #check destiny api key is set as an environment variable
     api_key = _get_arg_from_env_or_error(API_KEY_ENV_NAME)
+    verbose = args.verbose
+    match_distance = args.match_distance
+
+    open_fireteam = args.open_fireteam
+    prefetch_fireteam = args.prefetch_fireteam or open_fireteam
+    prefetch_limit = args.prefetch_limit
+
+    # prefetched players are only kept in the player index, so without it
+    # prefetching is wasted work unless their reports are being opened
+    if prefetch_fireteam and args.no_player_index and not open_fireteam:
+        print("Warning: --prefetch-fireteam requires the player index. Ignoring --prefetch-fireteam")
+        prefetch_fireteam = False
+
+    if prefetch_fireteam:
+        prefetch_executor = ThreadPoolExecutor(max_workers=1)
+
+    show_summary = args.summary
+    if show_summary:
+        summary_executor = ThreadPoolExecutor(max_workers=2)
+
+    if not args.no_player_index:
+        player_index = PlayerIndex(PLAYER_INDEX_FILE)
+
+        if verbose:
+            print(f"Loaded {len(player_index)} players from local player index")
+
+    if args.ids_file:
+        if not os.path.isfile(args.ids_file):
+            print(f"Error: {args.ids_file} is not a valid file.")
+            sys.exit(1)
+
+        try:
+            bulk_lookup(args.ids_file, args.output, args.workers)
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    if engine == Engine.TEMPLATE:
+        try:
+            glyph_matcher = GlyphMatcher.load(args.glyph_atlas)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not load glyph atlas from {args.glyph_atlas}. Build one with build_glyph_atlas.py. {e}")
+            sys.exit(1)
 
     if engine == Engine.OPENAI or fallback:
         #check openai key is set as an environment variable
         _get_arg_from_env_or_error(OPENAI_API_KEY_ENV_NAME)
 
-    screenshot_dir = args.screenshot_dir
+    if args.memory_budget:
+        memory_budget = args.memory_budget * 1024 * 1024
 
-    if not os.path.isdir(args.screenshot_dir):
-        print(f"Error: {screenshot_dir} is not a valid directory.")
-        sys.exit(1)
+    if args.video:
+        source = int(args.video) if args.video.isdigit() else args.video
+
+        try:
+            watch_video(source, args.sample_fps, args.roi)
+        except Exception as e:
+            print(f"An error occurred. Aborting : {e}")
+            traceback.print_exc()
+            sys.exit(1)
+        sys.exit(0)
+
+    screenshot_dirs = args.screenshot_dir
+    recursive = args.recursive
+    file_patterns = args.pattern
+
+    for screenshot_dir in screenshot_dirs:
+        if not os.path.isdir(screenshot_dir):
+            print(f"Error: {screenshot_dir} is not a valid directory.")
+            sys.exit(1)
 
-    verbose = args.verbose
     #optimize_screenshot = args.optimize_image
     #optimize_screenshot = engine == Engine.OPENAI
     optimize_screenshot = True
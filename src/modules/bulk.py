@@ -0,0 +1,185 @@
+# Copyright (c) 2025 Mike Chambers
+# https://github.com/mikechambers/echo
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is furnished to do
+# so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import csv
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from modules.destiny import Destiny
+from modules.member import BungieId
+
+DEFAULT_WORKERS = 8
+#Bungie allows roughly 25 requests a second per api key
+DEFAULT_REQUESTS_PER_SECOND = 20.0
+
+
+class RateLimiter:
+    """Simple thread safe limiter that spaces calls out to a max rate."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def read_bungie_ids(path: str):
+    """
+    Reads Bungie Ids from a text or CSV file. Every cell in the file is
+    checked, so a pasted list (one id per line) or a sign up sheet with a
+    column of ids both work.
+
+    Returns:
+        tuple: (list of unique valid BungieIds in file order, list of cells
+        containing a # which are not valid ids)
+    """
+
+    seen = set()
+    valid = []
+    invalid = []
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            for cell in row:
+                value = cell.strip()
+                if not value:
+                    continue
+
+                bungie_id = BungieId.from_string(value)
+                if not bungie_id.is_valid:
+                    #headers, team names, emails etc. are skipped silently.
+                    #Only cells that look like an attempt at an id are reported
+                    if "#" in value:
+                        invalid.append(value)
+                    continue
+
+                if bungie_id in seen:
+                    continue
+
+                seen.add(bungie_id)
+                valid.append(bungie_id)
+
+    return valid, invalid
+
+
+def resolve_bungie_ids(bungie_ids, api_key: str, workers: int = DEFAULT_WORKERS,
+                       requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                       verbose: bool = False):
+    """
+    Resolves BungieIds to Members concurrently. Invalid and duplicate ids are
+    skipped. Results are yielded as they complete (not in input order).
+
+    Yields:
+        tuple: (BungieId, Member or None, error string or None)
+    """
+
+    unique_ids = []
+    seen = set()
+    for bungie_id in bungie_ids:
+        if not bungie_id.is_valid or bungie_id in seen:
+            continue
+        seen.add(bungie_id)
+        unique_ids.append(bungie_id)
+
+    destiny = Destiny(api_key, verbose)
+    limiter = RateLimiter(requests_per_second)
+
+    def _resolve(bungie_id):
+        limiter.wait()
+        return destiny.retrieve_member(bungie_id)
+
+    workers = max(1, workers)
+    pending_ids = iter(unique_ids)
+    futures = {}
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        #only keep a small window of lookups in flight, so stopping early
+        #(Ctrl-C or closing the generator) doesn't leave thousands queued
+        while True:
+            for bungie_id in pending_ids:
+                futures[executor.submit(_resolve, bungie_id)] = bungie_id
+                if len(futures) >= workers * 2:
+                    break
+
+            if not futures:
+                break
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                bungie_id = futures.pop(future)
+                try:
+                    yield bungie_id, future.result(), None
+                except Exception as e:
+                    yield bungie_id, None, str(e)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ResultWriter:
+    """Streams lookup results to a CSV or JSONL file (chosen by extension)."""
+
+    FIELDS = ["bungie_id", "membership_id", "platform_id", "error"]
+
+    def __init__(self, f, as_jsonl: bool):
+        self._f = f
+        self._as_jsonl = as_jsonl
+        self._csv = None
+
+        if not as_jsonl:
+            self._csv = csv.writer(f)
+            self._csv.writerow(self.FIELDS)
+
+    @staticmethod
+    def is_jsonl_path(path: str) -> bool:
+        return path.lower().endswith((".jsonl", ".ndjson"))
+
+    def write(self, bungie_id: BungieId, member, error):
+        if not error and not member:
+            error = "not found"
+
+        row = [
+            str(bungie_id),
+            member.membership_id if member else "",
+            member.platform_id if member else "",
+            error or "",
+        ]
+
+        if self._as_jsonl:
+            self._f.write(json.dumps(dict(zip(self.FIELDS, row))) + "\n")
+        else:
+            self._csv.writerow(row)
+
+        self._f.flush()
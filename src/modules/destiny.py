@@ -24,6 +24,10 @@ import requests
 from dateutil import parser
 import random
 from modules.member import BungieId, Member
+from modules.mode import Mode
+
+#root of all API urls. Can be changed to point at a local test server
+API_ROOT = "https://www.bungie.net/Platform"
 
 class Destiny:
 
@@ -35,7 +39,7 @@ class Destiny:
         self._user_agent = "echo"
 
     def retrieve_member(self, bungie_id:BungieId):
-        url = "https://www.bungie.net/Platform/Destiny2/SearchDestinyPlayerByBungieName/-1/"
+        url = f"{API_ROOT}/Destiny2/SearchDestinyPlayerByBungieName/-1/"
 
         data = {
             "displayName": bungie_id.name,
@@ -97,12 +101,61 @@ class Destiny:
         return Member(out["membershipId"], out["membershipType"])
 
     def retrieve_linked_profiles(self, membership_id:str, platform_id:int) -> dict:
-        url = f"https://www.bungie.net/Platform/Destiny2/{platform_id}/Profile/{membership_id}/LinkedProfiles"
+        url = f"{API_ROOT}/Destiny2/{platform_id}/Profile/{membership_id}/LinkedProfiles"
 
         response = self.retrieve_json_get(url)
 
         return response["Response"]["profiles"]
 
+    def retrieve_member_by_id(self, membership_id:str):
+        """
+        Looks up a member from just their membership id (for example from
+        a party members list, which doesn't include the platform).
+
+        Returns:
+            tuple: (BungieId, Member) for the most recently played profile, or None
+        """
+
+        #-1 searches all platforms
+        profiles = self.retrieve_linked_profiles(membership_id, -1)
+
+        if not profiles:
+            return None
+
+        profile = max(profiles, key=lambda p: parser.isoparse(p["dateLastPlayed"]))
+
+        code = BungieId.parse_code(profile.get("bungieGlobalDisplayNameCode"))
+        bungie_id = BungieId(profile.get("bungieGlobalDisplayName", ""), code)
+
+        return bungie_id, Member(profile["membershipId"], profile["membershipType"])
+
+    def retrieve_party_member_ids(self, member:Member) -> list:
+        """
+        Returns the membership ids of the other players in the member's
+        current party, from the transitory data component. Returns an empty
+        list if they are not in a party, or their privacy settings hide it.
+        """
+
+        rnd = random.randint(10000, 10000000)
+        url = f"{API_ROOT}/Destiny2/{member.platform_id}/Profile/{member.membership_id}/?components=1000&rnd={rnd}"
+
+        if self.verbose:
+            print(f"retrieve_party_member_ids : {url}")
+
+        data = self.retrieve_json_get(url)
+
+        transitory = data["Response"].get("profileTransitoryData", {}).get("data")
+        if not transitory:
+            return []
+
+        ids = []
+        for party_member in transitory.get("partyMembers", []):
+            membership_id = party_member["membershipId"]
+            if membership_id != member.membership_id:
+                ids.append(membership_id)
+
+        return ids
+
     # this assumes api_key is set once before any API calls
     def _get_headers(self):
 
@@ -117,8 +170,9 @@ class Destiny:
 
         return self._headers
 
-    def retrieve_current_activity_modes(self, member:Member):
-        profile = self.retrieve_profile(member)
+    def retrieve_current_activity_modes(self, member:Member, profile=None):
+        if profile is None:
+            profile = self.retrieve_profile(member)
 
         character = self.find_most_recent_character(profile)
 
@@ -147,10 +201,23 @@ class Destiny:
         return mostRecentCharacter
 
 
-    def retrieve_profile(self, member:Member):
+    def retrieve_activity_history(self, member:Member, character_id:str, mode:Mode, count:int = 25) -> list:
+        """Returns the character's most recent activities for mode, newest first."""
+
+        url = f"{API_ROOT}/Destiny2/{member.platform_id}/Account/{member.membership_id}/Character/{character_id}/Stats/Activities/?mode={mode.value}&count={count}&page=0"
+
+        if self.verbose:
+            print(f"retrieve_activity_history : {url}")
+
+        data = self.retrieve_json_get(url)
+
+        #no activities key if there are no activities for the mode
+        return data["Response"].get("activities", [])
+
+    def retrieve_profile(self, member:Member, components:str = "200,204,1000"):
 
         rnd = random.randint(10000, 10000000)
-        url = f"https://www.bungie.net/Platform/Destiny2/{member.platform_id}/Profile/{member.membership_id}/?components=200,204,1000&rnd={rnd}"
+        url = f"{API_ROOT}/Destiny2/{member.platform_id}/Profile/{member.membership_id}/?components={components}&rnd={rnd}"
 
         if self.verbose:
             print(f"retrieve_profile : {url}")
@@ -0,0 +1,219 @@
+# Copyright (c) 2025 Mike Chambers
+# https://github.com/mikechambers/echo
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is furnished to do
+# so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Reads frames from a video file or capture device and decides which ones
+# are worth running OCR on. Frames are sampled at a fixed rate, and each
+# sample is downscaled before being compared, so the work per frame stays
+# small enough to keep up with 60 fps input.
+
+import threading
+import time
+import cv2
+import numpy as np
+
+#size frames are reduced to for change detection
+DETECT_SIZE = (160, 90)
+
+#difference (0 - 255) for a pixel in a sample to count as changed
+PIXEL_THRESHOLD = 25
+
+#fraction of pixels that must change between samples to count as a change.
+#Kept low so a small card appearing is still noticed
+CHANGE_THRESHOLD = 0.002
+
+#number of unchanged samples after a change before the view is considered
+#settled (i.e. the player card has finished animating in)
+SETTLE_SAMPLES = 2
+
+#names are drawn in near white on a dark background
+TEXT_THRESHOLD = 150
+
+
+def crop_roi(frame, roi):
+    """Crops frame to roi, given as (x, y, w, h) fractions of the frame size."""
+    if not roi:
+        return frame
+
+    height, width = frame.shape[:2]
+    x, y, w, h = roi
+    x0, y0 = int(x * width), int(y * height)
+    return frame[y0:y0 + int(h * height), x0:x0 + int(w * width)]
+
+
+class ChangeDetector:
+    """
+    Tracks downscaled samples of a stream and reports when a new view has
+    appeared and settled.
+    """
+
+    def __init__(self, threshold: float = CHANGE_THRESHOLD, settle_samples: int = SETTLE_SAMPLES):
+        self.threshold = threshold
+        self.settle_samples = settle_samples
+        self._min_changed = max(1, int(threshold * DETECT_SIZE[0] * DETECT_SIZE[1]))
+
+        self._previous = None
+        self._last_triggered = None
+        self._changed = False
+        self._stable = 0
+
+    def _is_different(self, a, b) -> bool:
+        return np.count_nonzero(cv2.absdiff(a, b) > PIXEL_THRESHOLD) >= self._min_changed
+
+    def update(self, frame) -> bool:
+        #resize before converting to gray so the conversion is cheap
+        small = cv2.resize(frame, DETECT_SIZE, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        previous = self._previous
+        self._previous = small
+
+        if previous is None:
+            self._changed = True
+            self._stable = 0
+            return False
+
+        if self._is_different(small, previous):
+            self._changed = True
+            self._stable = 0
+            return False
+
+        self._stable += 1
+        if not self._changed or self._stable < self.settle_samples:
+            return False
+
+        self._changed = False
+
+        #ignore views that settle back to what we last looked at (i.e. a
+        #menu opening and closing over the same card)
+        if self._last_triggered is not None and not self._is_different(small, self._last_triggered):
+            return False
+
+        self._last_triggered = small
+        return True
+
+
+def find_name_regions(frame):
+    """
+    Finds regions that look like a line of light text on a dark background.
+    Works on a half size copy of the frame.
+
+    Returns:
+        list: (x, y, w, h) boxes in half size coordinates.
+    """
+
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    gray = cv2.pyrDown(gray)
+
+    _, binary = cv2.threshold(gray, TEXT_THRESHOLD, 255, cv2.THRESH_BINARY)
+
+    #join the characters of a line into a single blob
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1))
+    joined = cv2.dilate(binary, kernel)
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(joined, connectivity=8)
+    stats = stats[1:]
+
+    w = stats[:, cv2.CC_STAT_WIDTH]
+    h = stats[:, cv2.CC_STAT_HEIGHT]
+    fill = stats[:, cv2.CC_STAT_AREA] / np.maximum(w * h, 1)
+
+    keep = (h >= 5) & (h <= 40) & (w >= 4 * h) & (fill > 0.3) & (fill < 0.98)
+    return [tuple(s[:4]) for s in stats[keep].tolist()]
+
+
+class FrameSource:
+    """
+    Reads frames from a video file or a capture device.
+
+    Files are read as fast as possible, grabbing (but not decoding) frames
+    between samples. Live devices are read on a background thread which
+    only keeps the newest frame, so slow processing drops frames instead of
+    falling behind.
+    """
+
+    def __init__(self, source, sample_fps: float = 10.0):
+        self.is_live = isinstance(source, int)
+        self.sample_fps = sample_fps
+
+        self._capture = cv2.VideoCapture(source)
+        if not self._capture.isOpened():
+            raise IOError(f"Could not open video source {source}")
+
+        fps = self._capture.get(cv2.CAP_PROP_FPS) or 60.0
+        self.frame_step = max(1, round(fps / sample_fps))
+
+        self._latest = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def _read_live(self):
+        while self._running:
+            ok, frame = self._capture.read()
+            if not ok:
+                self._running = False
+                break
+
+            with self._lock:
+                self._latest = frame
+
+    def frames(self):
+        """Yields sampled frames until the source ends."""
+
+        if not self.is_live:
+            while True:
+                for _ in range(self.frame_step - 1):
+                    if not self._capture.grab():
+                        return
+
+                ok, frame = self._capture.read()
+                if not ok:
+                    return
+
+                yield frame
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._read_live, daemon=True)
+        self._thread.start()
+
+        interval = 1.0 / self.sample_fps
+        next_time = time.monotonic()
+
+        while self._running:
+            with self._lock:
+                frame = self._latest
+                self._latest = None
+
+            if frame is not None:
+                yield frame
+
+            #if processing fell behind, don't try to catch up
+            next_time = max(next_time + interval, time.monotonic())
+            time.sleep(max(0.0, next_time - time.monotonic()))
+
+    def close(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+        self._capture.release()
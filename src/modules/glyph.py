@@ -0,0 +1,391 @@
+# Copyright (c) 2025 Mike Chambers
+# https://github.com/mikechambers/echo
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is furnished to do
+# so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Template matching OCR for the fixed font Destiny uses for player names.
+#
+# Text is found by thresholding the screenshot and grouping connected
+# components into lines. Each glyph is scaled relative to its line, and all
+# glyphs in the screenshot are classified at once with a single matrix
+# multiply against an atlas of templates built from labelled captures.
+
+import json
+import os
+import re
+import cv2
+import numpy as np
+
+TEMPLATES_FILE = "templates.npy"
+LABELS_FILE = "labels.json"
+
+GLYPH_HEIGHT = 24
+GLYPH_WIDTH = 24
+
+#names are drawn in near white on a dark background
+INK_THRESHOLD = 150
+
+MIN_COMPONENT_HEIGHT = 6
+MAX_COMPONENT_HEIGHT = 80
+
+#line box relative to the typical glyph height (above and below the
+#baseline), so descenders fit
+ASCENT_SCALE = 1.15
+DESCENT_SCALE = 0.35
+
+#gap between glyphs, relative to glyph height, that counts as a space
+SPACE_GAP_SCALE = 0.35
+
+#gap, relative to glyph height, that ends a line
+LINE_GAP_SCALE = 1.5
+
+#glyphs scoring lower than this against every template are treated as
+#unknown (for example the shield icon before the name)
+MIN_SCORE = 0.6
+
+BUNGIE_ID_RE = re.compile(r"^.+#\d{4}$")
+
+#shortest possible name line: one character, # and the 4 digit code
+MIN_ID_GLYPHS = 6
+
+#position of the # in a name line, counting from the end
+ID_HASH_INDEX = -5
+
+
+class _Line:
+    __slots__ = ("top", "bottom", "right", "height", "boxes")
+
+    def __init__(self, x, y, w, h):
+        self.top = y
+        self.bottom = y + h
+        self.right = x + w
+        self.height = h
+        self.boxes = [[x, y, w, h]]
+
+    def accepts(self, x, y, w, h):
+        overlap = min(y + h, self.bottom) - max(y, self.top)
+        return overlap >= 0.5 * min(h, self.height)
+
+    def add(self, x, y, w, h):
+        self.boxes.append([x, y, w, h])
+        self.right = max(self.right, x + w)
+
+        if h >= MIN_COMPONENT_HEIGHT:
+            self.top = min(self.top, y)
+            self.bottom = max(self.bottom, y + h)
+            self.height = max(self.height, h)
+
+
+def _find_lines(binary):
+    """Groups connected components into horizontal lines of text."""
+
+    #grana is ~3x faster than the default algorithm for sparse text images
+    _, _, stats, _ = cv2.connectedComponentsWithStatsWithAlgorithm(binary, 8, cv2.CV_32S, cv2.CCL_GRANA)
+
+    #first component is the background
+    stats = stats[1:]
+    heights = stats[:, cv2.CC_STAT_HEIGHT]
+    stats = stats[(heights <= MAX_COMPONENT_HEIGHT) & (stats[:, cv2.CC_STAT_AREA] >= 2)]
+    stats = stats[np.argsort(stats[:, cv2.CC_STAT_LEFT], kind="stable")]
+
+    active = []
+    done = []
+
+    for x, y, w, h, _ in stats.tolist():
+        placed = False
+        still_active = []
+
+        for line in active:
+            #components are sorted by x, so once a line is too far behind it
+            #can never be extended again
+            if x - line.right > LINE_GAP_SCALE * line.height:
+                done.append(line)
+                continue
+
+            still_active.append(line)
+
+            if not placed and line.accepts(x, y, w, h):
+                line.add(x, y, w, h)
+                placed = True
+
+        active = still_active
+
+        if not placed and h >= MIN_COMPONENT_HEIGHT:
+            active.append(_Line(x, y, w, h))
+
+    done.extend(active)
+    return done
+
+
+def _merge_boxes(boxes):
+    """Merges horizontally overlapping components (i.e. the dot of an i) into glyphs."""
+
+    glyphs = []
+    for x, y, w, h in boxes:
+        if glyphs and x < glyphs[-1][1] - 1:
+            glyph = glyphs[-1]
+            glyph[1] = max(glyph[1], x + w)
+            glyph[2] = min(glyph[2], y)
+            glyph[3] = max(glyph[3], y + h)
+        else:
+            glyphs.append([x, x + w, y, y + h])
+
+    return glyphs
+
+
+def _glyph_features(binary, x0, x1, top, bottom):
+    height, width = binary.shape
+
+    crop = binary[max(top, 0):min(bottom, height), x0:x1]
+    if top < 0 or bottom > height:
+        crop = np.pad(crop, ((max(0, -top), max(0, bottom - height)), (0, 0)))
+
+    scale = GLYPH_HEIGHT / (bottom - top)
+    w = max(1, min(GLYPH_WIDTH, round((x1 - x0) * scale)))
+    resized = cv2.resize(crop, (w, GLYPH_HEIGHT), interpolation=cv2.INTER_AREA)
+
+    #left align so glyph width is part of the template
+    out = np.zeros((GLYPH_HEIGHT, GLYPH_WIDTH), np.float32)
+    out[:, :w] = resized
+    return out.ravel()
+
+
+def _normalize(features):
+    features = features - features.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return features / norms
+
+
+def _layout_lines(binary):
+    """
+    Finds lines of text in a thresholded image, without extracting glyph
+    features.
+
+    Returns:
+        list: One (glyphs, top, bottom, spaces) tuple per line, where glyphs
+        is a list of [x0, x1, y0, y1] boxes, top / bottom are the rows
+        glyphs are scaled against, and spaces marks glyphs that follow a space.
+    """
+
+    out = []
+    for line in _find_lines(binary):
+        glyphs = _merge_boxes(line.boxes)
+
+        heights = np.array([g[3] - g[2] for g in glyphs])
+        ref_height = float(np.percentile(heights, 75))
+        baseline = int(np.median([g[3] for g in glyphs]))
+
+        top = int(baseline - ref_height * ASCENT_SCALE)
+        bottom = max(int(baseline + ref_height * DESCENT_SCALE), top + 1)
+
+        spaces = [False]
+        for prev, glyph in zip(glyphs, glyphs[1:]):
+            spaces.append(glyph[0] - prev[1] > SPACE_GAP_SCALE * ref_height)
+
+        out.append((glyphs, top, bottom, spaces))
+
+    return out
+
+
+def _line_features(binary, glyphs, top, bottom):
+    return _normalize(np.stack([_glyph_features(binary, g[0], g[1], top, bottom) for g in glyphs]))
+
+
+def _threshold(gray):
+    _, binary = cv2.threshold(gray, INK_THRESHOLD, 255, cv2.THRESH_BINARY)
+    return binary
+
+
+def extract_lines(gray):
+    """
+    Finds lines of text in a grayscale image.
+
+    Returns:
+        list: One (features, spaces) tuple per line, where features is an
+        array with one normalized row per glyph, and spaces is a list of
+        bools marking glyphs that follow a space.
+    """
+
+    binary = _threshold(gray)
+    return [(_line_features(binary, glyphs, top, bottom), spaces) for glyphs, top, bottom, spaces in _layout_lines(binary)]
+
+
+class GlyphMatcher:
+    def __init__(self, templates, labels):
+        self.templates = templates
+        self.labels = labels
+
+    @classmethod
+    def load(cls, atlas_dir: str):
+        """Loads an atlas saved by build_atlas. Templates are memory mapped."""
+        templates = np.load(os.path.join(atlas_dir, TEMPLATES_FILE), mmap_mode="r")
+
+        with open(os.path.join(atlas_dir, LABELS_FILE), encoding="utf-8") as f:
+            labels = json.load(f)
+
+        if templates.shape[0] == 0:
+            raise ValueError(f"Glyph atlas in {atlas_dir} has no templates")
+
+        if len(labels) != templates.shape[0]:
+            raise ValueError(f"Glyph atlas in {atlas_dir} has {templates.shape[0]} templates but {len(labels)} labels")
+
+        return cls(templates, labels)
+
+    def _classify(self, features):
+        scores = features @ self.templates.T
+        best = scores.argmax(axis=1)
+        return best, scores[np.arange(len(best)), best]
+
+    def _read(self, lines):
+        if not lines:
+            return []
+
+        #classify every glyph at once
+        best, best_scores = self._classify(np.concatenate([f for f, _ in lines]))
+
+        out = []
+        i = 0
+        for _, spaces in lines:
+            chars = []
+            line_scores = []
+
+            for space in spaces:
+                score = float(best_scores[i])
+                label = self.labels[best[i]] if score >= MIN_SCORE else None
+                i += 1
+
+                if label is None and not chars:
+                    continue
+
+                if space and chars:
+                    chars.append(" ")
+
+                chars.append(label if label is not None else "?")
+                line_scores.append(score)
+
+            if chars:
+                out.append(("".join(chars), sum(line_scores) / len(line_scores)))
+
+        return out
+
+    def read_lines(self, gray):
+        """
+        Reads every line of text in a grayscale image.
+
+        Returns:
+            list: (text, mean score) tuples. Unknown glyphs at the start of a
+            line are dropped, and elsewhere are returned as "?".
+        """
+
+        return self._read(extract_lines(gray))
+
+    def _id_candidates(self, binary):
+        """
+        Returns the laid out lines that could be a Bungie Id: long enough, and
+        (if the atlas has one) with a # five glyphs from the end. Only that
+        one glyph per line is classified, so most lines are skipped before
+        their features are extracted.
+        """
+
+        lines = [line for line in _layout_lines(binary) if len(line[0]) >= MIN_ID_GLYPHS]
+        if not lines or "#" not in self.labels:
+            return lines
+
+        probes = np.stack([_glyph_features(binary, *line[0][ID_HASH_INDEX][:2], line[1], line[2]) for line in lines])
+        best, best_scores = self._classify(_normalize(probes))
+
+        hash_index = self.labels.index("#")
+        return [line for line, b, score in zip(lines, best, best_scores) if b == hash_index and score >= MIN_SCORE]
+
+    def find_bungie_id(self, gray) -> str:
+        """
+        Returns the best scoring line of the form NAME#1234, or an empty
+        string if none is found.
+        """
+
+        binary = _threshold(gray)
+        lines = [(_line_features(binary, glyphs, top, bottom), spaces) for glyphs, top, bottom, spaces in self._id_candidates(binary)]
+
+        best = ""
+        best_score = 0.0
+
+        for text, score in self._read(lines):
+            if score > best_score and BUNGIE_ID_RE.match(text):
+                best = text
+                best_score = score
+
+        return best
+
+
+def build_atlas(samples, atlas_dir: str, verbose: bool = False):
+    """
+    Builds a template atlas from labelled captures and saves it to atlas_dir.
+
+    Args:
+        samples: Iterable of (grayscale image, bungie id string) tuples.
+            Images cropped to the name line work best. For full screenshots,
+            the sample is only used if a single line has the right number
+            of glyphs.
+
+    Returns:
+        int: The number of samples used. Nothing is saved if this is 0.
+    """
+
+    sums = {}
+    counts = {}
+    used = 0
+
+    for gray, label in samples:
+        chars = [c for c in label if not c.isspace()]
+
+        #allow for the shield icon at the start of the line
+        candidates = [f for f, _ in extract_lines(gray) if len(chars) <= f.shape[0] <= len(chars) + 1]
+
+        if len(candidates) != 1:
+            if verbose:
+                print(f"Could not find a single name line for {label}. Skipping")
+            continue
+
+        features = candidates[0][-len(chars):]
+        for c, f in zip(chars, features):
+            if c in sums:
+                sums[c] += f
+                counts[c] += 1
+            else:
+                sums[c] = f.copy()
+                counts[c] = 1
+
+        used += 1
+
+    #don't replace an existing atlas with an empty one
+    if not used:
+        return used
+
+    labels = sorted(sums)
+    templates = _normalize(np.stack([sums[c] / counts[c] for c in labels])).astype(np.float32)
+
+    os.makedirs(atlas_dir, exist_ok=True)
+    np.save(os.path.join(atlas_dir, TEMPLATES_FILE), templates)
+
+    with open(os.path.join(atlas_dir, LABELS_FILE), "w", encoding="utf-8") as f:
+        json.dump(labels, f, ensure_ascii=False)
+
+    return used
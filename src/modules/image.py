@@ -0,0 +1,126 @@
+# Copyright (c) 2025 Mike Chambers
+# https://github.com/mikechambers/echo
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is furnished to do
+# so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import base64
+import os
+import cv2
+from PIL import Image
+
+#size of each read when base64 encoding files. Must be a multiple of 3 so
+#chunks can be encoded independently without padding in the middle.
+ENCODE_CHUNK_SIZE = 3 * 64 * 1024
+
+#scale factors that cv2 can decode at directly
+REDUCTION_FACTORS = [1, 2, 4, 8]
+
+_GRAYSCALE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+#below this width text in the name line gets too small for OCR, so we never
+#reduce past it regardless of the memory budget
+MIN_DECODE_WIDTH = 1280
+
+
+def get_image_size(path: str):
+    """Returns (width, height) by reading the image header only."""
+    with Image.open(path) as img:
+        return img.size
+
+
+def reduction_for_budget(width: int, height: int, channels: int, budget_bytes: int) -> int:
+    """
+    Returns the smallest supported reduction factor which keeps the decoded
+    image within budget_bytes. Returns 1 if there is no budget.
+    """
+
+    if not budget_bytes:
+        return 1
+
+    factor = 1
+    for f in REDUCTION_FACTORS:
+        if width // f < MIN_DECODE_WIDTH:
+            break
+
+        factor = f
+        if (width // f) * (height // f) * channels <= budget_bytes:
+            break
+
+    return factor
+
+
+def read_image(path: str, grayscale: bool = False, budget_bytes: int = None):
+    """
+    Loads an image with cv2, decoding at reduced scale if needed to fit
+    within budget_bytes. JPEGs are scaled while decoding, so the full size
+    image is never held in memory.
+
+    Returns:
+        numpy.ndarray: The image, or None if it could not be loaded.
+    """
+
+    factor = 1
+    if budget_bytes:
+        width, height = get_image_size(path)
+        factor = reduction_for_budget(width, height, 1 if grayscale else 3, budget_bytes)
+
+    flags = _GRAYSCALE_FLAGS if grayscale else _COLOR_FLAGS
+    return cv2.imread(path, flags[factor])
+
+
+def encode_image_base64(path: str) -> str:
+    """
+    Base64 encodes a file, reading it in chunks into a preallocated buffer
+    so the whole raw file is never held in memory. This is not streaming:
+    the encoded buffer and the returned str are both full size copies, and
+    callers building a data url (i.e. _open_ai_parse) make another.
+    """
+
+    size = os.path.getsize(path)
+    out = bytearray(4 * ((size + 2) // 3))
+    pos = 0
+
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(ENCODE_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            encoded = base64.b64encode(chunk)
+            out[pos:pos + len(encoded)] = encoded
+            pos += len(encoded)
+
+    #file may have changed size since we checked
+    if pos != len(out):
+        del out[pos:]
+
+    return out.decode("ascii")
@@ -0,0 +1,278 @@
+# Copyright (c) 2025 Mike Chambers
+# https://github.com/mikechambers/echo
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is furnished to do
+# so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import os
+import threading
+import time
+from modules.member import BungieId, Member
+
+DEFAULT_MAX_SIZE = 500000
+
+#compact the log once it has this many more lines than live entries
+COMPACT_SLACK = 10000
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Levenshtein distance between a and b. Stops early and returns
+    max_distance + 1 once the distance is known to be larger than max_distance.
+    """
+
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(value)
+            row_min = min(row_min, value)
+
+        if row_min > max_distance:
+            return max_distance + 1
+
+        previous = current
+
+    return min(previous[-1], max_distance + 1)
+
+
+class BKTree:
+    """BK-tree of names for finding all names within an edit distance."""
+
+    def __init__(self):
+        self._root = None
+
+    def add(self, name: str):
+        if self._root is None:
+            self._root = (name, {})
+            return
+
+        node = self._root
+        while True:
+            node_name, children = node
+            #exact distance is needed to place the node
+            d = edit_distance(name, node_name, max(len(name), len(node_name)))
+            if d == 0:
+                return
+
+            if d not in children:
+                children[d] = (name, {})
+                return
+
+            node = children[d]
+
+    def search(self, name: str, max_distance: int):
+        """Returns a list of (distance, name) within max_distance."""
+
+        out = []
+        if self._root is None:
+            return out
+
+        nodes = [self._root]
+        while nodes:
+            node_name, children = nodes.pop()
+            d = edit_distance(name, node_name, max(len(name), len(node_name)))
+
+            if d <= max_distance:
+                out.append((d, node_name))
+
+            for child_d, child in children.items():
+                if d - max_distance <= child_d <= d + max_distance:
+                    nodes.append(child)
+
+        return out
+
+
+class PlayerIndex:
+    """
+    Persistent index of every BungieId resolved to a Member. Entries are
+    appended to a JSON lines file as they are added, and the file is
+    compacted on load once it has built up enough stale lines.
+
+    Names are indexed by their 4 digit code, so approximate matches only
+    ever compare names that share the same code. The BK-tree for a code is
+    only built the first time a name with that code is searched for.
+    """
+
+    def __init__(self, path: str, max_size: int = DEFAULT_MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+
+        #reentrant, since find_closest calls get
+        self._lock = threading.RLock()
+        self._members = {}
+        self._last_used = {}
+        self._names_by_code = {}
+        self._trees = {}
+        self._log_lines = 0
+
+        self._load()
+
+    def __len__(self):
+        return len(self._members)
+
+    def _load(self):
+        if not os.path.isfile(self.path):
+            return
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                self._log_lines += 1
+                try:
+                    entry = json.loads(line)
+                    bungie_id = BungieId(entry["name"], entry["code"])
+                    self._members[bungie_id] = Member(entry["membership_id"], entry["platform_id"])
+                    self._last_used[bungie_id] = entry.get("t", 0.0)
+                except (ValueError, KeyError):
+                    continue
+
+        for bungie_id in self._members:
+            self._names_by_code.setdefault(bungie_id.code, set()).add(bungie_id.name)
+
+        if len(self._members) > self.max_size or self._log_lines > len(self._members) + COMPACT_SLACK:
+            self.compact()
+
+    def _tree_for(self, code: str):
+        """Returns the BK-tree for code, building it if needed, or None if there are no names with code."""
+        tree = self._trees.get(code)
+        if tree is not None:
+            return tree
+
+        names = self._names_by_code.get(code)
+        if not names:
+            return None
+
+        tree = BKTree()
+        for name in names:
+            tree.add(name)
+
+        self._trees[code] = tree
+        return tree
+
+    @staticmethod
+    def _entry(bungie_id: BungieId, member: Member, t: float) -> str:
+        return json.dumps({
+            "name": bungie_id.name,
+            "code": bungie_id.code,
+            "membership_id": member.membership_id,
+            "platform_id": member.platform_id,
+            "t": t,
+        }, ensure_ascii=False) + "\n"
+
+    def get(self, bungie_id: BungieId):
+        """Returns the Member for an exact BungieId match, or None."""
+        with self._lock:
+            member = self._members.get(bungie_id)
+            if member:
+                #saved so least recently used eviction still works after a restart
+                t = time.time()
+                self._last_used[bungie_id] = t
+                self._append(bungie_id, member, t)
+            return member
+
+    def _append(self, bungie_id: BungieId, member: Member, t: float):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(self._entry(bungie_id, member, t))
+        self._log_lines += 1
+
+    def find_closest(self, bungie_id: BungieId, max_distance: int = 1):
+        """
+        Finds the closest indexed BungieId with the same code whose name is
+        within max_distance edits. If more than one name is equally close,
+        the match is ambiguous and nothing is returned.
+
+        Returns:
+            tuple: (BungieId, Member), or None if there is no single best match.
+        """
+
+        #adds from other threads (i.e. fireteam prefetch) modify the trees
+        with self._lock:
+            member = self.get(bungie_id)
+            if member:
+                return bungie_id, member
+
+            if max_distance <= 0:
+                return None
+
+            tree = self._tree_for(bungie_id.code)
+            if tree is None:
+                return None
+
+            matches = sorted(tree.search(bungie_id.name, max_distance))
+            if not matches or (len(matches) > 1 and matches[0][0] == matches[1][0]):
+                return None
+
+            match = BungieId(matches[0][1], bungie_id.code)
+            return match, self.get(match)
+
+    def add(self, bungie_id: BungieId, member: Member):
+        with self._lock:
+            is_new = bungie_id not in self._members
+
+            t = time.time()
+            self._members[bungie_id] = member
+            self._last_used[bungie_id] = t
+
+            if is_new:
+                self._names_by_code.setdefault(bungie_id.code, set()).add(bungie_id.name)
+
+                tree = self._trees.get(bungie_id.code)
+                if tree is not None:
+                    tree.add(bungie_id.name)
+
+            self._append(bungie_id, member, t)
+
+            if len(self._members) > self.max_size:
+                self._compact()
+
+    def compact(self):
+        """Rewrites the index file with one line per entry, evicting the least recently used entries if over max_size."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        if len(self._members) > self.max_size:
+            #evict down to 90% so we don't compact on every add
+            keep = int(self.max_size * 0.9)
+            by_age = sorted(self._last_used.items(), key=lambda item: item[1], reverse=True)
+
+            for bungie_id, _ in by_age[keep:]:
+                del self._members[bungie_id]
+                del self._last_used[bungie_id]
+                self._names_by_code[bungie_id.code].discard(bungie_id.name)
+
+                #names can't be removed from a BK-tree, so it is rebuilt
+                #the next time it is needed
+                self._trees.pop(bungie_id.code, None)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for bungie_id, member in self._members.items():
+                f.write(self._entry(bungie_id, member, self._last_used[bungie_id]))
+
+        os.replace(tmp_path, self.path)
+        self._log_lines = len(self._members)
@@ -0,0 +1,101 @@
+# Copyright (c) 2025 Mike Chambers
+# https://github.com/mikechambers/echo
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is furnished to do
+# so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from modules.mode import Mode
+
+#standing value for a win in activity history
+VICTORY_STANDING = 0
+
+
+def _value(values: dict, name: str) -> float:
+    return values.get(name, {}).get("basic", {}).get("value", 0.0)
+
+
+class ActivitySummary:
+    """Totals for a list of activities from the activity history endpoint."""
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.kills = 0
+        self.deaths = 0
+        self.assists = 0
+
+    @classmethod
+    def from_activities(cls, activities):
+        """Reduces each activity to the few values needed, so the full responses can be freed."""
+        summary = cls()
+
+        for activity in activities:
+            values = activity.get("values", {})
+
+            summary.games += 1
+            summary.kills += int(_value(values, "kills"))
+            summary.deaths += int(_value(values, "deaths"))
+            summary.assists += int(_value(values, "assists"))
+
+            if "standing" in values and _value(values, "standing") == VICTORY_STANDING:
+                summary.wins += 1
+
+        return summary
+
+    @property
+    def kd(self) -> float:
+        return self.kills / self.deaths if self.deaths else float(self.kills)
+
+    @property
+    def losses(self) -> int:
+        return self.games - self.wins
+
+    def __str__(self):
+        if not self.games:
+            return "No games found"
+
+        return f"K/D {self.kd:.2f} ({self.kills} kills / {self.deaths} deaths) : {self.wins}-{self.losses} W/L in {self.games} games"
+
+
+def format_modes(mode_values) -> str:
+    """Formats a list of activity mode ids, ignoring any we don't know about."""
+    names = []
+    for value in mode_values:
+        try:
+            names.append(str(Mode(value)))
+        except ValueError:
+            continue
+
+    return ", ".join(names) if names else "Not in an activity"
+
+
+def format_summary(name: str, mode_values, pvp: ActivitySummary, trials: ActivitySummary) -> str:
+    rows = [
+        ("Current activity", format_modes(mode_values)),
+        ("Recent PvP", str(pvp)),
+        ("Recent Trials", str(trials)),
+    ]
+
+    width = max(len(label) for label, _ in rows)
+
+    lines = [name]
+    for label, value in rows:
+        lines.append(f"  {label.ljust(width)} : {value}")
+
+    return "\n".join(lines)
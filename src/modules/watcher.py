@@ -0,0 +1,223 @@
+# Copyright (c) 2025 Mike Chambers
+# https://github.com/mikechambers/echo
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is furnished to do
+# so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import fnmatch
+import json
+import os
+import queue
+import re
+import threading
+import time
+from watchdog.events import FileSystemEventHandler
+
+
+def build_path_filter(extensions, patterns=None):
+    """
+    Builds a single compiled regex from the allowed extensions and optional
+    filename glob patterns, so each event is checked with one match call.
+
+    Returns:
+        callable: Takes a path and returns True if it should be processed.
+    """
+
+    ext_regex = "|".join(re.escape(ext.lstrip(".")) for ext in extensions)
+    ext_re = re.compile(rf".*\.(?:{ext_regex})\Z", re.IGNORECASE | re.DOTALL)
+
+    name_re = None
+    if patterns:
+        name_re = re.compile("|".join(fnmatch.translate(p) for p in patterns), re.IGNORECASE)
+
+    def path_filter(path: str) -> bool:
+        if not ext_re.match(path):
+            return False
+
+        if name_re and not name_re.match(os.path.basename(path)):
+            return False
+
+        return True
+
+    return path_filter
+
+
+class MtimeIndex:
+    """
+    Stores the mtime of the most recent screenshot processed for each watched
+    directory, so files written while the script was not running can be
+    found on startup.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtimes = {}
+
+        if os.path.isfile(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._mtimes = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read index {path}. Error: {e}. Ignoring")
+
+    def get(self, root: str):
+        return self._mtimes.get(os.path.abspath(root))
+
+    def update(self, root: str, mtime: float):
+        root = os.path.abspath(root)
+
+        with self._lock:
+            if mtime <= self._mtimes.get(root, 0.0):
+                return
+
+            self._mtimes[root] = mtime
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._mtimes, f)
+
+        os.replace(tmp_path, self.path)
+
+
+def scan_backlog(root: str, since: float, recursive: bool, path_filter):
+    """
+    Finds files under root modified after since.
+
+    Returns:
+        list: (mtime, path) tuples sorted oldest first.
+    """
+
+    found = []
+    dirs = [root]
+
+    while dirs:
+        current = dirs.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            dirs.append(entry.path)
+                        continue
+
+                    if not path_filter(entry.path):
+                        continue
+
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+
+                if mtime > since:
+                    found.append((mtime, entry.path))
+
+    found.sort()
+    return found
+
+
+class ScreenshotQueue:
+    """
+    Queue of (root, path) screenshots waiting to be processed. A path can't
+    be queued again while it is queued or being processed, so a file seen
+    both by the backlog scan and a watch event is not processed twice. Once
+    processed, the same path can be queued again (i.e. a capture tool that
+    overwrites the same file).
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def put(self, root: str, path: str) -> bool:
+        key = self._key(path)
+
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+
+        self._queue.put((root, path))
+        return True
+
+    def get(self, timeout=None):
+        return self._queue.get(timeout=timeout)
+
+    def task_done(self, path: str):
+        with self._lock:
+            self._pending.discard(self._key(path))
+
+        self._queue.task_done()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+class ScreenshotEventHandler(FileSystemEventHandler):
+    """Queues new (or moved in) screenshots for a single watched root."""
+
+    def __init__(self, root: str, path_filter, screenshot_queue: ScreenshotQueue, verbose: bool = False):
+        super().__init__()
+        self.root = root
+        self.path_filter = path_filter
+        self.screenshot_queue = screenshot_queue
+        self.verbose = verbose
+
+    def _queue(self, path: str):
+        if not self.path_filter(path):
+            return
+
+        if self.screenshot_queue.put(self.root, path) and self.verbose:
+            print(f"New image detected: {path}")
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._queue(event.src_path)
+
+    def on_moved(self, event):
+        #some capture tools write to a temp name and then rename
+        if not event.is_directory:
+            self._queue(event.dest_path)
+
+
+def wait_for_write(path: str, settle_seconds: float = 1.0):
+    """Waits until path has not been modified for settle_seconds."""
+    while True:
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return
+
+        if age >= settle_seconds:
+            return
+
+        time.sleep(settle_seconds - age)